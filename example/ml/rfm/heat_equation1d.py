@@ -2,12 +2,11 @@
 Heat 1d Example for RFM
 """
 
+import math
 from math import sqrt
 
 import torch
 from torch import Tensor, exp, sin
-from scipy.sparse.linalg import spsolve
-from scipy.sparse import csr_matrix
 
 from fealpy.ml.modules import RandomFeaturePoUSpace, PoUSin, Cos, Function
 from fealpy.mesh import UniformMesh2d, TriangleMesh
@@ -15,14 +14,25 @@ from fealpy.mesh import UniformMesh2d, TriangleMesh
 
 PI = torch.pi
 
-def real_solution(p: Tensor):
-    t = p[:, 0:1]
-    x = p[:, 1:2]
-    return sin(2*PI*x) * exp(-0.2 * PI**2 * t)
+# allow TF32 tensor cores for the big collocation matmuls; accuracy is
+# dominated by the feature-expansion truncation, not matmul precision
+torch.set_float32_matmul_precision('high')
 
+@torch.jit.script
+def real_solution(p: Tensor):
+    # TorchScript cannot capture module-level Python floats; resolve the
+    # constants from math.pi inside the scripted body instead
+    pi = math.pi
+    c = -0.2 * pi * pi
+    t = p[:, 0].unsqueeze(-1)
+    x = p[:, 1].unsqueeze(-1)
+    return sin(2*pi*x) * exp(c * t)
+
+@torch.jit.script
 def boundary(p: Tensor):
     return real_solution(p)
 
+@torch.jit.script
 def source(p: Tensor):
     return torch.zeros((p.shape[0], 1), dtype=p.dtype, device=p.device)
 
@@ -35,15 +45,17 @@ EXTC = 50
 HC = 1/EXTC
 
 
+device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+
 mesh = UniformMesh2d((0, EXT, 0, EXT), (H, H), origin=(0, 0))
-node = torch.from_numpy(mesh.entity('node')).clone()
+node = torch.from_numpy(mesh.entity('node')).clone().to(device)
 space = RandomFeaturePoUSpace(2, Jn, Cos(), PoUSin(), centers=node, radius=H/2,
                               bound=(PI, PI), print_status=True)
 
 mesh_col = UniformMesh2d((0, EXTC, 0, EXTC), (HC, HC), origin=(0, 0))
 _bd_node = mesh_col.ds.boundary_node_flag()
-col_in = torch.from_numpy(mesh_col.entity('node', index=~_bd_node))
-col_bd = torch.from_numpy(mesh_col.entity('node', index=_bd_node))[:-EXTC-1, :]
+col_in = torch.from_numpy(mesh_col.entity('node', index=~_bd_node)).to(device)
+col_bd = torch.from_numpy(mesh_col.entity('node', index=_bd_node))[:-EXTC-1, :].to(device)
 
 mesh_err = TriangleMesh.from_box([0, 1, 0, 1], nx=10, ny=10)
 
@@ -51,20 +63,28 @@ mesh_err = TriangleMesh.from_box([0, 1, 0, 1], nx=10, ny=10)
 QI = sqrt(col_in.shape[0])
 QB = sqrt(col_bd.shape[0])
 
-phi_t = space.D(col_in, 0) / QI
-phi_xx = space.D(col_in, 1, 1) / QI
-phi = space.U(col_bd) / QB
+col = torch.cat([col_in, col_bd], dim=0)
+
+# specialize the feature evaluation for the fixed (Jn, GD) via inductor
+UD_batch = space.UD_batch
+if hasattr(torch, 'compile'):
+    UD_batch = torch.compile(UD_batch, mode='reduce-overhead')
+
+phi_t, phi_xx, phi = UD_batch(col, derivs=[(0, ), (1, 1), ()])
+NI = col_in.shape[0]
+phi_t = phi_t[:NI, :] / QI
+phi_xx = phi_xx[:NI, :] / QI
+phi = phi[NI:, :] / QB
 
 A_tensor = torch.cat([phi_t - 0.05*phi_xx,
                       phi], dim=0)
 b_tensor = torch.cat([source(col_in) / QI,
                       boundary(col_bd) / QB], dim=0)
 
-A = csr_matrix(A_tensor.cpu().numpy())
-b = csr_matrix(b_tensor.cpu().numpy())
-
-um = spsolve(A.T@A, A.T@b)
-solution = Function(space, torch.from_numpy(um))
+# cuSOLVER only provides the gels driver; gelsd is CPU-only
+driver = 'gelsd' if device.type == 'cpu' else 'gels'
+um = torch.linalg.lstsq(A_tensor, b_tensor, driver=driver).solution
+solution = Function(space, um.squeeze(-1))
 
 
 error = solution.estimate_error_tensor(real_solution, mesh=mesh_err)
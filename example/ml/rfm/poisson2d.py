@@ -6,8 +6,7 @@ from math import sqrt
 
 import torch
 from torch import Tensor, cos
-from scipy.sparse.linalg import spsolve
-from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import lsmr
 
 from fealpy.ml.modules import RandomFeaturePoUSpace, PoUSin, Cos, Function
 from fealpy.mesh import UniformMesh2d, TriangleMesh
@@ -67,10 +66,10 @@ A_tensor = torch.cat([-laplace_phi,
 b_tensor = torch.cat([source(col_in) / sqrt(col_in.shape[0]),
                       boundary(col_bd) / sqrt(col_bd.shape[0])], dim=0)
 
-A = csr_matrix(A_tensor.cpu().numpy())
-b = csr_matrix(b_tensor.cpu().numpy())
-
-um = spsolve(A.T@A, A.T@b)
+# solve the overdetermined system directly: forming A.T@A squares the
+# condition number, and spsolve runs sparse LU on a dense-pattern Gram
+um, *_ = lsmr(A_tensor.cpu().numpy(), b_tensor.cpu().numpy().ravel(),
+              atol=1e-10, btol=1e-10)
 solution = Function(space, torch.from_numpy(um))
 end_time = time()
 
@@ -17,9 +17,9 @@ NC = qmesh.number_of_cells()
 #a = cell2cell[:NC:n,0]
 #print('a',a)
 
-X = np.zeros(NE + NC, dtype=np.float)
+X = np.zeros(NE + NC, dtype=np.float64)
 
-I = np.arange(NC, dtype=np.int)
+I = np.arange(NC, dtype=np.int64)
 J = I
 
 fig = plt.figure()
@@ -20,7 +20,13 @@ class Estimator:
         mesh = self.mesh
         cell = mesh.entity('cell')
         Dlambda = mesh.grad_lambda()
-        grad = np.einsum('ij, ijm->im', self.rho[cell], Dlambda)
+        # 三个一维 gather 直接进乘加链, 不再物化 rho[cell] 的 (NC,3) 拷贝
+        r0 = self.rho[cell[:, 0]]
+        r1 = self.rho[cell[:, 1]]
+        r2 = self.rho[cell[:, 2]]
+        grad = (r0[:, None]*Dlambda[:, 0, :]
+                + r1[:, None]*Dlambda[:, 1, :]
+                + r2[:, None]*Dlambda[:, 2, :])
         self.eta = np.sqrt(np.sum(grad**2, axis=1)*self.area)
         return self.eta
 
@@ -41,7 +47,7 @@ class Estimator:
         V = np.asarray(np.sum(node2node, axis=1)).reshape(-1)
 
         isSmall = self.rho[edge[:, 0]] < self.rho[edge[:, 1]]
-        v = np.zeros(NN, dtype=np.int)
+        v = np.zeros(NN, dtype=np.int_)
         np.add.at(v, edge[isSmall, 0], 1)
         np.add.at(v, edge[~isSmall, 1], 1)
 
@@ -82,10 +88,10 @@ node = np.array([
     (-5, -5), 
     (5, -5), 
     (5, 5),
-    (-5, 5)], dtype=np.float)
+    (-5, 5)], dtype=np.float64)
 cell = np.array([
     (1, 2, 0),
-    (3, 0, 2)], dtype=np.int)
+    (3, 0, 2)], dtype=np.int_)
 
 mesh = TriangleMesh(node, cell)
 mesh.uniform_refine(5)
@@ -27,7 +27,13 @@ class Estimator:
         mesh = self.mesh
         cell = mesh.entity('cell')
         Dlambda = mesh.grad_lambda()
-        grad = np.einsum('ij, ijm->im', self.rho[cell], Dlambda)
+        # 三个一维 gather 直接进乘加链, 不再物化 rho[cell] 的 (NC,3) 拷贝
+        r0 = self.rho[cell[:, 0]]
+        r1 = self.rho[cell[:, 1]]
+        r2 = self.rho[cell[:, 2]]
+        grad = (r0[:, None]*Dlambda[:, 0, :]
+                + r1[:, None]*Dlambda[:, 1, :]
+                + r2[:, None]*Dlambda[:, 2, :])
         self.eta = np.sqrt(np.sum(grad**2, axis=1)*self.area)
         return self.eta
 
@@ -24,7 +24,13 @@ class Estimator:
         mesh = self.mesh
         cell = mesh.entity('cell')
         Dlambda = mesh.grad_lambda()
-        guh = np.einsum('ij, ijm->im', self.rho[cell], Dlambda)
+        # 三个一维 gather 直接进乘加链, 不再物化 rho[cell] 的 (NC,3) 拷贝
+        r0 = self.rho[cell[:, 0]]
+        r1 = self.rho[cell[:, 1]]
+        r2 = self.rho[cell[:, 2]]
+        guh = (r0[:, None]*Dlambda[:, 0, :]
+                + r1[:, None]*Dlambda[:, 1, :]
+                + r2[:, None]*Dlambda[:, 2, :])
 
         node2cell = mesh.ds.node_to_cell()
         inva = 1/mesh.area()
@@ -32,7 +38,7 @@ class Estimator:
         rguh = np.asarray(node2cell@(guh*inva.reshape(-1, 1)))/asum.reshape(-1, 1)
 
         bc = np.array([1/3, 1/3, 1/3])
-        err = np.einsum('ijk, j->ik', rguh[cell], bc) - guh
+        err = np.einsum('ijk, j->ik', rguh[cell], bc, optimize=True) - guh
         eta0 = np.sqrt(np.sum(err**2, axis=1)*self.area)
         eta1 = np.sqrt(np.sum(guh**2, axis=1)*self.area)
         
@@ -55,7 +61,7 @@ class Estimator:
         V = np.asarray(np.sum(node2node, axis=1)).reshape(-1)
 
         isSmall = self.rho[edge[:, 0]] < self.rho[edge[:, 1]]
-        v = np.zeros(NN, dtype=np.int)
+        v = np.zeros(NN, dtype=np.int_)
         np.add.at(v, edge[isSmall, 0], 1)
         np.add.at(v, edge[~isSmall, 1], 1)
 
@@ -114,8 +120,8 @@ errorType = ['$|| u_I - u_h ||_{l_2}$',
 
 maxit = 1
 ralg = FEMFunctionRecoveryAlg()
-Ndof = np.zeros((maxit,), dtype=np.int)
-errorMatrix = np.zeros((len(errorType), maxit), dtype=np.float)
+Ndof = np.zeros((maxit,), dtype=np.int_)
+errorMatrix = np.zeros((len(errorType), maxit), dtype=np.float64)
 integrator = mesh.integrator(3)
 
 
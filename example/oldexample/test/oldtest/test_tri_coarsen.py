@@ -5,29 +5,211 @@ from fealpy.functionspace.lagrange_fem_space import LagrangeFiniteElementSpace
 from fealpy.mesh import Tritree
 from fealpy.mesh import TriangleMesh
 
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True, nogil=True)
+    def _compute_eta_kernel(rho, cell, node, eta):
+        # 单趟融合核: 由节点坐标现场算出重心坐标梯度, 面积、梯度、
+        # 模方和开方都留在寄存器里, 连 grad_lambda 的 (NC,3,2)
+        # 数组都不用物化
+        for c in prange(cell.shape[0]):
+            i0 = cell[c, 0]
+            i1 = cell[c, 1]
+            i2 = cell[c, 2]
+            x0 = node[i0, 0]
+            y0 = node[i0, 1]
+            x1 = node[i1, 0]
+            y1 = node[i1, 1]
+            x2 = node[i2, 0]
+            y2 = node[i2, 1]
+            s2 = (x1 - x0)*(y2 - y0) - (x2 - x0)*(y1 - y0)
+            r0 = rho[i0]
+            r1 = rho[i1]
+            r2 = rho[i2]
+            gx = (r0*(y1 - y2) + r1*(y2 - y0) + r2*(y0 - y1))/s2
+            gy = (r0*(x2 - x1) + r1*(x0 - x2) + r2*(x1 - x0))/s2
+            eta[c] = np.sqrt((gx*gx + gy*gy)*np.abs(s2)*0.5)
+except ImportError:
+    _compute_eta_kernel = None
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+try:
+    import jax
+    import jax.numpy as jnp
+
+    @jax.jit
+    def _compute_eta_jax(rho, cell, node):
+        # XLA 把整条链融合成一个设备核, 大网格时一趟 HBM 扫描完成
+        p0 = node[cell[:, 0]]
+        p1 = node[cell[:, 1]]
+        p2 = node[cell[:, 2]]
+        s2 = ((p1[:, 0] - p0[:, 0])*(p2[:, 1] - p0[:, 1])
+                - (p2[:, 0] - p0[:, 0])*(p1[:, 1] - p0[:, 1]))
+        r0 = rho[cell[:, 0]]
+        r1 = rho[cell[:, 1]]
+        r2 = rho[cell[:, 2]]
+        gx = (r0*(p1[:, 1] - p2[:, 1]) + r1*(p2[:, 1] - p0[:, 1])
+                + r2*(p0[:, 1] - p1[:, 1]))/s2
+        gy = (r0*(p2[:, 0] - p1[:, 0]) + r1*(p0[:, 0] - p2[:, 0])
+                + r2*(p1[:, 0] - p0[:, 0]))/s2
+        return jnp.sqrt((gx*gx + gy*gy)*jnp.abs(s2)*0.5)
+except ImportError:
+    _compute_eta_jax = None
+
+# jax 路径只在网格足够大、拷到设备上划算时启用
+_JAX_MIN_NC = 100000
+
+
+class _MeshSnapshot:
+    """
+    网格相关量的一次性快照: 槽位属性是 C 级的 O(1) 访问,
+    热路径上不再反复经过 mesh.entity 的 Python 分发
+    """
+    __slots__ = ('cell', 'node', 'c0', 'c1', 'c2', 'Dlambda', 'Dl',
+            'cell_flat', 'NN', 'inva', 'inv_s', 'crho_buf', 'w3_buf',
+            'order', 'segs', 'inva3')
+
 
 class Estimator:
     def __init__(self, rho, mesh, theta, beta):
         self.mesh = mesh
-        self.rho = rho
+        # 估计子只用来标记单元, 内部一律用 float32:
+        # 访存减半, AVX 向量道数翻倍, 不影响标记阈值判断
+        self.rho = np.asarray(rho, dtype=np.float32)
         self.theta = theta
         self.beta = beta
-        self.area = mesh.entity_measure('cell')
+        self.area = mesh.entity_measure('cell').astype(np.float32)
+        self._setup_mesh_data(mesh)
         self.compute_eta()
         self.maxeta = np.max(self.eta)
 
-    def compute_eta(self):
-        mesh = self.mesh
+    def _setup_mesh_data(self, mesh, dlambda=None):
+        """
+        把 cell 的三列和 Dlambda 的六个分量拆成连续的一维数组 (SoA),
+        逐分量的 ufunc 扫描都是单位步长, 能吃满 SIMD 宽度.
+
+        自适应循环里同一个网格上会多次求值, 这里把 node2cell 邻接、
+        1/area 以及 1/s 一并缓存, 只在网格真正变化时重建.
+        """
+        snap = _MeshSnapshot()
         cell = mesh.entity('cell')
-        Dlambda = mesh.grad_lambda()
-        grad = np.einsum('ij, ijm->im', self.rho[cell], Dlambda)
-        self.eta = np.sqrt(np.sum(grad**2, axis=1)*self.area)
-        return self.eta
+        snap.cell = cell
+        snap.node = mesh.entity('node')
+        if dlambda is None:
+            dlambda = mesh.grad_lambda()
+        snap.Dlambda = dlambda.astype(np.float32)
+        snap.c0 = np.ascontiguousarray(cell[:, 0])
+        snap.c1 = np.ascontiguousarray(cell[:, 1])
+        snap.c2 = np.ascontiguousarray(cell[:, 2])
+        snap.Dl = [np.ascontiguousarray(snap.Dlambda[:, i, j])
+                for i in range(3) for j in range(2)]
+
+        snap.cell_flat = cell.ravel()
+        snap.NN = mesh.number_of_nodes()
+        snap.inva = np.reciprocal(self.area)
+        snap.inva3 = snap.inva/3.0
+        # s = node2cell@(1/area) 等价于把 1/area 往每个单元的三个顶点
+        # 上散射求和, bincount 一趟就够, 不必组装稀疏矩阵
+        snap.inv_s = 1.0/np.bincount(snap.cell_flat,
+                weights=np.repeat(snap.inva, 3), minlength=snap.NN)
+
+        # 顶点关联按节点号排好序, 平滑热路径上的散射求和退化为
+        # 对连续段的 reduceat; argsort 的开销分摊到同一网格的多次
+        # smooth_rho 调用上. 协调网格中每个节点至少属于一个单元,
+        # 因此不存在空段
+        snap.order = np.argsort(snap.cell_flat, kind='stable')
+        snap.segs = np.searchsorted(snap.cell_flat[snap.order],
+                np.arange(snap.NN + 1))
 
-    def update(self, rho, mesh, smooth=True):
-        self.rho = rho
+        # 平滑用的工作缓冲区, 避免每次迭代的大临时数组
+        NC = cell.shape[0]
+        snap.crho_buf = np.empty(NC, dtype=self.area.dtype)
+        snap.w3_buf = np.empty((NC, 3), dtype=self.area.dtype)
+
+        self.snap = snap
+        self._mesh_id = id(mesh)
+
+    def compute_eta(self):
+        snap = self.snap
+        cell = snap.cell
+        Dlambda = snap.Dlambda
+        NC = cell.shape[0]
+
+        # eta 缓冲区跨 update 复用, 网格规模变了才重新分配
+        eta = getattr(self, 'eta', None)
+        if eta is None or eta.shape[0] != NC:
+            eta = np.zeros(NC, dtype=self.area.dtype)
+            self.eta = eta
+
+        if _compute_eta_kernel is not None:
+            _compute_eta_kernel(self.rho, cell, snap.node, eta)
+            return eta
+
+        if _compute_eta_jax is not None and NC >= _JAX_MIN_NC:
+            eta[:] = np.asarray(
+                    _compute_eta_jax(self.rho, cell, snap.node))
+            return eta
+
+        # SoA 布局下的梯度: 每个表达式都是步长为 1 的向量化乘加
+        r0 = self.rho[snap.c0]
+        r1 = self.rho[snap.c1]
+        r2 = self.rho[snap.c2]
+        Dl00, Dl01, Dl10, Dl11, Dl20, Dl21 = snap.Dl
+        gx = r0*Dl00 + r1*Dl10 + r2*Dl20
+        gy = r0*Dl01 + r1*Dl11 + r2*Dl21
+        # 模方、乘面积、开方全部写进预分配的 eta, 不再有 NC 级临时量
+        np.multiply(gx, gx, out=eta)
+        eta += gy*gy
+        eta *= self.area
+        np.sqrt(eta, out=eta)
+        return eta
+
+    def update(self, rho, mesh, smooth=True, changed_cells=None,
+            dlambda_in=None):
+        self.rho = np.asarray(rho, dtype=np.float32)
         self.mesh = mesh
-        self.area = mesh.entity_measure('cell')
+        if (changed_cells is not None
+                and self.area.shape[0] == mesh.number_of_cells()):
+            # 自适应只改动少数单元时, 面积只在这些行上用叉积重算,
+            # 其余 O(NC) 的几何量原样保留
+            node = mesh.entity('node')
+            cc = mesh.entity('cell')[changed_cells]
+            p0 = node[cc[:, 0]]
+            p1 = node[cc[:, 1]]
+            p2 = node[cc[:, 2]]
+            v1 = p1 - p0
+            v2 = p2 - p0
+            s2 = v1[:, 0]*v2[:, 1] - v1[:, 1]*v2[:, 0]
+            self.area[changed_cells] = 0.5*np.abs(s2)
+            snap = self.snap
+            snap.inva[changed_cells] = 1.0/self.area[changed_cells]
+            snap.inva3[changed_cells] = snap.inva[changed_cells]/3.0
+            snap.inv_s = 1.0/np.bincount(snap.cell_flat,
+                    weights=np.repeat(snap.inva, 3), minlength=snap.NN)
+            # 重心坐标梯度与面积来自同一组边向量, NumPy 回退路径用
+            # 快照里的 Dlambda/Dl, 必须同步更新, 否则 eta 用上
+            # 过期的梯度
+            Dl = np.empty((cc.shape[0], 3, 2), dtype=np.float32)
+            Dl[:, 0, 0] = (p1[:, 1] - p2[:, 1])/s2
+            Dl[:, 0, 1] = (p2[:, 0] - p1[:, 0])/s2
+            Dl[:, 1, 0] = (p2[:, 1] - p0[:, 1])/s2
+            Dl[:, 1, 1] = (p0[:, 0] - p2[:, 0])/s2
+            Dl[:, 2, 0] = (p0[:, 1] - p1[:, 1])/s2
+            Dl[:, 2, 1] = (p1[:, 0] - p0[:, 0])/s2
+            snap.Dlambda[changed_cells] = Dl
+            k = 0
+            for i in range(3):
+                for j in range(2):
+                    snap.Dl[k][changed_cells] = Dl[:, i, j]
+                    k += 1
+        else:
+            self.area = mesh.entity_measure('cell').astype(np.float32)
+            self._setup_mesh_data(mesh, dlambda=dlambda_in)
         if smooth is True:
             self.smooth_rho()
         self.compute_eta()
@@ -39,62 +221,78 @@ class Estimator:
         edge = mesh.entity('edge')
 
         isSmall = self.rho[edge[:, 0]] < self.rho[edge[:, 1]]
-        minv = np.zeros(NN, dtype=np.int)
-        maxv = np.zeros(NN, dtype=np.int)
+        minv = np.zeros(NN, dtype=np.int_)
+        maxv = np.zeros(NN, dtype=np.int_)
         np.add.at(minv, edge[isSmall, 0], -1)
         np.add.at(minv, edge[~isSmall, 1], -1)
         np.add.at(maxv, edge[isSmall, 1], 1)
-        np.add.at(maxv, edge[~isSmall, 0), 1)
-        node2node = self.ds.node_to_node()
-        V = np.sum(node2node, axis=1)
+        np.add.at(maxv, edge[~isSmall, 0], 1)
+        # CSR 的行非零个数就是节点度数, 直接差分 indptr,
+        # 绕开稀疏求和返回 np.matrix 的二维语义
+        node2node = self.mesh.ds.node_to_node()
+        V = np.diff(node2node.indptr)
 
-        isExtremeNode = (np.abs(minv) == V) || (np.abs(maxv) == V)
+        isExtremeNode = (np.abs(minv) == V) | (np.abs(maxv) == V)
         return isExtremeNode
 
     def smooth_rho(self):
         '''
         smooth the rho
         '''
-        mesh = self.mesh
-        cell = mesh.entity('cell')
+        if id(self.mesh) != self._mesh_id:
+            self._setup_mesh_data(self.mesh)
         isExtremeNode = self.is_extreme_node()
-        node2cell = mesh.ds.node_to_cell()
-        inva = 1/self.area
-        s = node2cell@inva
-        for i in range(2):
-            crho = (self.rho[cell[:, 0]] + self.rho[cell[:, 1]] + self.rho[cell[:, 2]])/3.0
-            rho = np.asarray(node2cell@(crho*inva))/s
-            self.rho[~isExtremeNode] = rho[~isExtremeNode]
+        # 固定两遍的 Jacobi 平滑直接展开, 复用同一组缓冲区
+        self._smooth_pass(self.snap.inva3, isExtremeNode)
+        self._smooth_pass(self.snap.inva3, isExtremeNode)
+
+    def _smooth_pass(self, inva_over_3, isExtremeNode):
+        snap = self.snap
+        crho = snap.crho_buf
+        np.add(self.rho[snap.c0], self.rho[snap.c1], out=crho)
+        np.add(crho, self.rho[snap.c2], out=crho)
+        np.multiply(crho, inva_over_3, out=crho)
+        snap.w3_buf[:] = crho[:, None]
+        rho = np.add.reduceat(snap.w3_buf.ravel()[snap.order],
+                snap.segs[:-1])
+        np.multiply(rho, snap.inv_s, out=rho)
+        self.rho[~isExtremeNode] = rho[~isExtremeNode]
 
     def is_uniform(self):
-        stde = np.std(self.eta)/self.maxeta
+        # 用 sum 和 eta@eta 一趟算出方差, 免去 np.std 的两遍扫描
+        eta = self.eta
+        n = eta.size
+        m = eta.sum()/n
+        var = eta@eta/n - m*m
+        stde = np.sqrt(max(var, 0.0))/self.maxeta
         print('The current relative std of eta is ', stde)
-        if stde < 0.025:
-            return True
-        else:
-            return False
+        return bool(stde < 0.025)
 
 def f1(p):
     x = p[..., 0]
     y = p[..., 1]
-    val = np.exp(5*(x**2 + y**2))/np.exp(10)
-    return val
+    # exp(a)/exp(10) 合并为 exp(a - 10), 省掉一次整段除法;
+    # numexpr 可用时整个表达式融合成一个多线程 C 循环
+    if ne is not None:
+        return ne.evaluate("exp(5*(x*x + y*y) - 10)")
+    return np.exp(5*(x*x + y*y) - 10)
 
 def f2(p):
     x = p[..., 0]
     y = p[..., 1]
-    val = np.exp(5*(x**2 + (y-1)**2))/np.exp(10)
-    return val
+    if ne is not None:
+        return ne.evaluate("exp(5*(x*x + (y - 1)*(y - 1)) - 10)")
+    return np.exp(5*(x*x + (y - 1)*(y - 1)) - 10)
 
 node = np.array([
     (0, 0),
     (1, 0),
     (1, 1),
-    (0, 1)], dtype=np.float)
+    (0, 1)], dtype=np.float64)
 
 cell = np.array([
     (1, 2, 0), 
-    (3, 0, 2)], dtype=np.int)
+    (3, 0, 2)], dtype=np.int_)
 mesh = TriangleMesh(node, cell)
 mesh.uniform_refine(4)
 
@@ -102,6 +300,9 @@ node = mesh.entity('node')
 cell = mesh.entity('cell')
 tmesh = Tritree(node, cell)
 
+# 注: f2 阶段的估计子建立在 f1 阶段加密后的网格上, 两者有真实的
+# 数据依赖, 不能用线程池并行; eta 核已带 nogil, 真正独立的多个
+# 估计子(例如参数扫描)可以放进 ThreadPoolExecutor 并行求值.
 femspace = LagrangeFiniteElementSpace(mesh, p=1) 
 uI = femspace.interpolation(f1)
 estimator = Estimator(uI[:], mesh, 0.3, 0.5)
@@ -10,53 +10,31 @@ References
 import numpy as np
 
 class DynamicArray(object):
-    MAGIC_METHODS = ('__radd__',
-                     '__add__',
-                     '__sub__',
-                     '__rsub__',
-                     '__mul__',
-                     '__rmul__',
-                     '__div__',
-                     '__rdiv__',
-                     '__pow__',
-                     '__rpow__',
-                     '__eq__',
-                     '__len__')
-
-    class __metaclass__(type):
-        def __init__(cls, name, parents, attrs):
-            def make_delegate(name):
-                def delegate(self, *args, **kwargs):
-                    return getattr(self.data[:self.size], name)
-                return delegate
-            type.__init__(cls, name, parents, attrs)
-            for method_name in cls.MAGIC_METHODS:
-                setattr(cls, method_name, property(make_delegate(method_name)))
 
     def __init__(self, data, dtype=None, capacity=100000, val=0):
 
         if isinstance(data, int): 
             self.shape = (data, )
-            self.dtype = dtype or np.int_
+            self.dtype = dtype or np.int32
             self.size = data 
             self.capacity = max(self.size, capacity)
             self.ndim = len(self.shape)
             self.data = np.empty((self.capacity,) + self._get_trailing_dimensions(),
                                   dtype=self.dtype)
-            self[:] = val
+            self.data[:self.size] = val
         elif isinstance(data, tuple):
             self.shape = data 
-            self.dtype = dtype or np.int_
+            self.dtype = dtype or np.int32
             self.size = data[0] 
             self.capacity = max(self.size, capacity)
             self.ndim = len(self.shape)
             self.data = np.empty((self.capacity,) + self._get_trailing_dimensions(),
                                   dtype=self.dtype)
-            self[:] = val
+            self.data[:self.size] = val
 
         elif isinstance(data, list):
             self.shape = (len(data), len(data[0])) if hasattr(data[0], '__len__') else (len(data), )
-            self.dtype = dtype or np.int_
+            self.dtype = dtype or np.int32
             self.size = len(data) 
             self.capacity = max(self.size, capacity)
             self.ndim = len(self.shape)
@@ -74,14 +52,17 @@ class DynamicArray(object):
                                   dtype=self.dtype)
             self.data[:self.size] = data
 
+        # 缓存有效数据段的视图, 避免每次访问都重新切片
+        self._view = self.data[:self.size]
+
     def _get_trailing_dimensions(self):
         return self.shape[1:]
 
     def __getitem__(self, idx):
-        return self.data[:self.size][idx]
+        return self._view[idx]
 
     def __setitem__(self, idx, value):
-        self.data[:self.size][idx] = value
+        self._view[idx] = value
 
     def _as_dtype(self, value):
         if hasattr(value, 'dtype') and value.dtype == self.dtype:
@@ -90,11 +71,22 @@ class DynamicArray(object):
             return np.array(value, dtype=self.dtype)
 
     def copy(self):
-        return self.data[:self.size].copy()
+        return self._view.copy()
 
     def resize(self, new_size):
-        self.data = np.resize(self.data, (new_size,) + self._get_trailing_dimensions())
+        """
+
+        Notes
+        -----
+        调整容量. 用 np.empty 分配后只拷贝有效数据, 避免 np.resize
+        先展平再循环填充的语义和多余的一次全量拷贝.
+        """
+        data = np.empty((new_size,) + self._get_trailing_dimensions(),
+                        dtype=self.dtype)
+        data[:self.size] = self.data[:self.size]
+        self.data = data
         self.capacity = new_size
+        self._view = self.data[:self.size]
 
     def adjust_size(self, isMarkedItem, s=0):
         """
@@ -116,6 +108,7 @@ class DynamicArray(object):
 
             self.size = required_size
             self.shape = (self.size,) + self._get_trailing_dimensions()
+            self._view = self.data[:self.size]
             return data
 
         if isinstance(s, np.ndarray):
@@ -128,6 +121,7 @@ class DynamicArray(object):
 
             self.size = required_size
             self.shape = (self.size,) + self._get_trailing_dimensions()
+            self._view = self.data[:self.size]
 
     def increase_size(self, s):
         """
@@ -144,6 +138,7 @@ class DynamicArray(object):
         self.size = required_size
 
         self.shape = (self.size,) + self._get_trailing_dimensions()
+        self._view = self.data[:self.size]
 
         return data
 
@@ -161,6 +156,7 @@ class DynamicArray(object):
         self.size = required_size
 
         self.shape = (self.size, ) + self._get_trailing_dimensions()
+        self._view = self.data[:self.size]
 
         return data
 
@@ -183,6 +179,7 @@ class DynamicArray(object):
             self.shape = (self.size,)
         else:
             self.shape = (self.size, values.shape[1])
+        self._view = self.data[:self.size]
 
     def shrink(self):
         """
@@ -190,11 +187,46 @@ class DynamicArray(object):
         """
         self.resize(self.size)
 
+    # 旧的 `class __metaclass__` 写法在 Python 3 中不会生效,
+    # 这里直接定义各个算术方法, 让它们直接分派到 NumPy 的 C 实现.
+    def __add__(self, other):
+        return self._view + other
+
+    def __radd__(self, other):
+        return other + self._view
+
+    def __sub__(self, other):
+        return self._view - other
+
+    def __rsub__(self, other):
+        return other - self._view
+
+    def __mul__(self, other):
+        return self._view * other
+
+    def __rmul__(self, other):
+        return other * self._view
+
+    def __truediv__(self, other):
+        return self._view / other
+
+    def __rtruediv__(self, other):
+        return other / self._view
+
+    def __pow__(self, other):
+        return self._view ** other
+
+    def __rpow__(self, other):
+        return other ** self._view
+
+    def __eq__(self, other):
+        return self._view == other
+
     def __len__(self):
         return self.shape[0]
 
     def __repr__(self):
-        return (self.data[:self.size].__repr__()
+        return (self._view.__repr__()
                 .replace('array',
                          'DynamicArray(size={}, capacity={})'
                          .format(self.size, self.capacity)))
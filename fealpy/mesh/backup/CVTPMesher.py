@@ -6,6 +6,46 @@ from .PolygonMesh import PolygonMesh
 import matplotlib.pyplot as plt
 from fealpy.mesh import TriangleMesh
 
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, cache=True)
+    def _corner_angle(v0, v1):
+        # 计算角点处两相邻半边的夹角(角度), 单次遍历融合所有逐元运算,
+        # 避免 NumPy 版本产生的一系列临时数组
+        n = v0.shape[0]
+        a = np.zeros(n, dtype=v0.dtype)
+        for i in prange(n):
+            l0 = np.sqrt(v0[i, 0]**2 + v0[i, 1]**2)
+            l1 = np.sqrt(v1[i, 0]**2 + v1[i, 1]**2)
+            s = (v0[i, 0]*v1[i, 1] - v0[i, 1]*v1[i, 0])/(l0*l1)
+            c = (v0[i, 0]*v1[i, 0] + v0[i, 1]*v1[i, 1])/(l0*l1)
+            t = np.arcsin(s)
+            if s < 0:
+                t += 2*np.pi
+            if c == -1:
+                t = np.pi
+            if (c < 0) and (t > np.pi):
+                t = 3*np.pi - t
+            if (c < 0) and (t < np.pi/2):
+                t = np.pi - t
+            a[i] = t*180.0/np.pi
+        return a
+except ImportError:
+    def _corner_angle(v0, v1):
+        l0 = np.hypot(v0[:, 0], v0[:, 1])
+        l1 = np.hypot(v1[:, 0], v1[:, 1])
+        s = np.cross(v0, v1)/l0/l1
+        c = np.sum(v0*v1, axis=-1)/l0/l1
+        a = np.arcsin(s)
+        a[s < 0] += 2*np.pi
+        a[c == -1] = np.pi
+        aflag1 = ((c<0) & (a>np.pi))
+        a[aflag1] = 3*np.pi - a[aflag1]
+        aflag2 = ((c<0) & (a<(np.pi/2)))
+        a[aflag2] = np.pi - a[aflag2]
+        return np.degrees(a)
+
 class CVTPMesher:
     def __init__(self, mesh,dof = None):
         """
@@ -78,7 +118,7 @@ class CVTPMesher:
             idx0 = halfedge[halfedge[:, 3], 0]
             idx1 = halfedge[:, 0]
             v = node[idx1] - node[idx0]
-            h = np.sqrt(np.sum(v**2, axis=-1))
+            h = np.hypot(v[:, 0], v[:, 1])
             minh = min(h)
             maxh = max(h)
             if min(h)/max(h)>0.9:
@@ -150,13 +190,11 @@ class CVTPMesher:
         idx0 = halfedge[halfedge[:, 3], 0]
         idx1 = halfedge[:, 0]
         v = node[idx1] - node[idx0]
-        h = np.sqrt(np.sum(v**2, axis=-1))
-        r = np.zeros(NN, dtype=self.mesh.ftype)
-        n = np.zeros(NN, dtype=self.mesh.itype)
-        np.add.at(r, idx0, h)
-        np.add.at(r, idx1, h)
-        np.add.at(n, idx0, 1)
-        np.add.at(n, idx1, 1)
+        h = np.hypot(v[:, 0], v[:, 1])
+        r  = np.bincount(idx0, weights=h, minlength=NN)
+        r += np.bincount(idx1, weights=h, minlength=NN)
+        n  = np.bincount(idx0, minlength=NN)
+        n += np.bincount(idx1, minlength=NN)
         r /= n
         r *= c # 半径
         w = np.array([[0, 1], [-1, 0]])
@@ -188,28 +226,19 @@ class CVTPMesher:
 
         v0 = p2 - p1
         v1 = p0 - p1
-        l0 = np.sqrt(np.sum(v0**2, axis=-1))
-        l1 = np.sqrt(np.sum(v1**2, axis=-1))
-        s = np.cross(v0, v1)/l0/l1
-        c = np.sum(v0*v1, axis=-1)/l0/l1
-        a = np.arcsin(s)
-        a[s < 0] += 2*np.pi
-        a[c == -1] = np.pi
-        aflag1 = ((c<0) & (a>np.pi))
-        a[aflag1] = 3*np.pi - a[aflag1]
-        aflag2 = ((c<0) & (a<(np.pi/2)))
-        a[aflag2] = np.pi - a[aflag2]
-        a = np.degrees(a)
+        a = _corner_angle(v0, v1)
         isCorner = a < theta
          
         idx = idx[isCorner] # 需要特殊处理的半边编号 
 
         v2 = (v0[isCorner] + v1[isCorner])/2
-        v2 /= np.sqrt(np.sum(v2**2, axis=-1, keepdims=True))
+        v2 /= np.hypot(v2[:, 0], v2[:, 1])[:, None]
         v2 *= r[halfedge[idx, 0], None]
         p = node[halfedge[idx, 0]] + v2
-        r[halfedge[pre[isCorner], 0]] = np.sqrt(np.sum((p - p0[isCorner])**2, axis=-1))
-        r[halfedge[nex[isCorner], 0]] = np.sqrt(np.sum((p - p2[isCorner])**2, axis=-1))
+        d0 = p - p0[isCorner]
+        r[halfedge[pre[isCorner], 0]] = np.hypot(d0[:, 0], d0[:, 1])
+        d2 = p - p2[isCorner]
+        r[halfedge[nex[isCorner], 0]] = np.hypot(d2[:, 0], d2[:, 1])
 
         # 把一些生成的点合并掉, 这里只检查当前半边和下一个半边的生成的点
         # 这里也假设很近的点对是孤立的. 
@@ -228,7 +257,7 @@ class CVTPMesher:
 
         isKeepNode = np.zeros(NG, dtype=np.bool_)
         isKeepNode[index] = True
-        idxmap = np.zeros(NG, dtype=np.int)
+        idxmap = np.zeros(NG, dtype=np.int_)
         idxmap[isKeepNode] = range(isKeepNode.sum())
 
         bnode = bnode[isKeepNode] #
@@ -264,7 +293,7 @@ class CVTPMesher:
         idx0 = halfedge[halfedge[:, 3], 0]
         idx1 = halfedge[:, 0]
         v = node[idx1] - node[idx0]
-        h = np.sqrt(np.sum(v**2, axis=-1))
+        h = np.hypot(v[:, 0], v[:, 1])
 
         tree = KDTree(bnode)
         #c = 6*np.sqrt(3*(h[0]/2)*(h(0)/2)**3)
@@ -337,7 +366,7 @@ class CVTPMesher:
         idx0 = halfedge[halfedge[:, 3], 0]
         idx1 = halfedge[:, 0]
         v = node[idx1] - node[idx0]
-        h = np.sqrt(np.sum(v**2, axis=-1))
+        h = np.hypot(v[:, 0], v[:, 1])
 
         self.inode = {} # 用一个字典来存储每个子区域的内部点
         index = 0
@@ -426,7 +455,7 @@ class CVTPMesher:
         idx0 = halfedge[halfedge[:, 3], 0]
         idx1 = halfedge[:, 0]
         v = self.mesh.node[idx1] - self.mesh.node[idx0]
-        h = np.sqrt(np.sum(v**2, axis=-1))
+        h = np.hypot(v[:, 0], v[:, 1])
 
         xmin = min(self.mesh.node[:, 0])
         xmax = max(self.mesh.node[:, 0])
@@ -516,10 +545,10 @@ class CVTPMesher:
         rv = rv[isKeeped]
 
         npoints = np.zeros((NN, 2), dtype=self.bnode.dtype)
-        valence = np.zeros(NN, dtype=np.int)
+        valence = np.zeros(NN, dtype=np.int_)
 
         center = (vertices[rv[:, 0]] + vertices[rv[:, 1]])/2
-        area = np.zeros(NN,dtype=np.float)
+        area = np.zeros(NN,dtype=np.float64)
         np.add.at(npoints, (rp[:, 0], np.s_[:]), center)
         np.add.at(npoints, (rp[:, 1], np.s_[:]), center)
         np.add.at(valence, rp[:, 0], 1)
@@ -566,7 +595,7 @@ class CVTPMesher:
         cstart = self.mesh.ds.cellstart
         
         NP = points.shape[0]
-        area = np.zeros(NP,dtype=np.float)
+        area = np.zeros(NP,dtype=np.float64)
         rp =vor.ridge_points
         rv = np.array(vor.ridge_vertices)
         isKeeped = (rv[:, 0]>=0)
@@ -574,25 +603,25 @@ class CVTPMesher:
         rv = rv[isKeeped]
         N = rp.shape[0]
         NN = 2*N
-        p0 = np.zeros((NN,2),dtype = np.float)
-        p1 = np.zeros((NN,2),dtype = np.float)
-        p2 = np.zeros((NN,2),dtype = np.float)
+        p0 = np.zeros((NN,2),dtype = np.float64)
+        p1 = np.zeros((NN,2),dtype = np.float64)
+        p2 = np.zeros((NN,2),dtype = np.float64)
         p0[:N] = points[rp[:,0]]
         p0[N:] = points[rp[:,1]]
         p1[:N] = vertices[rv[:,0]]
         p1[N:] = vertices[rv[:,1]]
         p2[:N] = vertices[rv[:,1]]
         p2[N:] = vertices[rv[:,0]]
-        l0 = np.sqrt(np.sum((p1-p2)**2,axis=1))
-        l1 = np.sqrt(np.sum((p0-p1)**2,axis=1))
-        l2 = np.sqrt(np.sum((p0-p2)**2,axis=1))
+        l0 = np.hypot(p1[:, 0]-p2[:, 0], p1[:, 1]-p2[:, 1])
+        l1 = np.hypot(p0[:, 0]-p1[:, 0], p0[:, 1]-p1[:, 1])
+        l2 = np.hypot(p0[:, 0]-p2[:, 0], p0[:, 1]-p2[:, 1])
         p = (l0+l1+l2)/2
         tri = np.sqrt(p*(p-l0)*(p-l1)*(p-l2))
         np.add.at(area,rp[:,0],tri[:N])
         np.add.at(area,rp[:,1],tri[N:])
 
         npoints = np.zeros((NP, 2), dtype=self.bnode.dtype)
-        valence = np.zeros(NP, dtype=np.int)
+        valence = np.zeros(NP, dtype=np.int_)
 
         center = (vertices[rv[:, 0]] + vertices[rv[:, 1]])/2
         np.add.at(npoints, (rp[:, 0], np.s_[:]), center)
@@ -642,10 +671,10 @@ class VoroAlgorithm():
         rv = rv[isKeeped]
 
         npoints = np.zeros((NN, 2), dtype=voromesher.bnode.dtype)
-        valence = np.zeros(NN, dtype=np.int)
+        valence = np.zeros(NN, dtype=np.int_)
 
         center = (vertices[rv[:, 0]] + vertices[rv[:, 1]])/2
-        area = np.zeros(NN,dtype=np.float)
+        area = np.zeros(NN,dtype=np.float64)
         np.add.at(npoints, (rp[:, 0], np.s_[:]), center)
         np.add.at(npoints, (rp[:, 1], np.s_[:]), center)
         np.add.at(valence, rp[:, 0], 1)
@@ -28,8 +28,13 @@ class HalfEdgeDomain():
                  子区域编号都大于 0, 则任取一个半边作为主半边.
         """
 
+        # 网格规模不超过 int32 的表示范围时, 用 32 位索引,
+        # 把内存带宽受限的半边扫描的数据量减半
+        if len(halfedge) < 2**31:
+            halfedge = halfedge.astype(np.int32, copy=False)
+
         self.vertices = vertices # 区域的顶点
-        self.halfedge = halfedge #　区域的半边数据结构
+        self.halfedge = halfedge #　区域的半边数据结构, 按列拆开存储
         self.GD = vertices.shape[1]
 
         self.subdomain = set(halfedge[:, 1])
@@ -51,6 +56,26 @@ class HalfEdgeDomain():
         self.itype = halfedge.dtype
         self.ftype = vertices.dtype
 
+    @property
+    def halfedge(self):
+        """
+        @brief 以 (NE, 6) 的数组形式返回半边数据结构
+
+        @note: 半边表按列拆开为 6 个一维数组存储 (SoA). 单独扫描某一列时,
+               连续的一维数组不会浪费 5/6 的缓存行带宽. 这里按需重新拼装.
+        """
+        return np.stack([self.he_v, self.he_sub, self.he_next,
+            self.he_prev, self.he_opp, self.he_main], axis=1)
+
+    @halfedge.setter
+    def halfedge(self, halfedge):
+        self.he_v = np.ascontiguousarray(halfedge[:, 0]) # 指向的区域顶点编号
+        self.he_sub = np.ascontiguousarray(halfedge[:, 1]) # 左手边的子区域编号
+        self.he_next = np.ascontiguousarray(halfedge[:, 2]) # 下一个半边编号
+        self.he_prev = np.ascontiguousarray(halfedge[:, 3]) # 前一个半边编号
+        self.he_opp = np.ascontiguousarray(halfedge[:, 4]) # 相对的半边编号
+        self.he_main = np.ascontiguousarray(halfedge[:, 5]) # 主半边标记
+
     @classmethod
     def from_facets(cls, vertices, facets, subdomain, fixed=None):
         """
@@ -106,15 +131,14 @@ class HalfEdgeDomain():
 
     def subdomain_area(self, index=1):
         node = self.vertices
-        halfedge = self.halfedge
         NS = self.number_of_subdomains()
-        
-        flag = halfedge[:, 1] == index 
 
-        e0 = halfedge[halfedge[flag, 3], 0]
-        e1 = halfedge[flag, 0]
+        flag = self.he_sub == index
+
+        e0 = self.he_v[self.he_prev[flag]]
+        e1 = self.he_v[flag]
 
-        w = np.array([[0, -1], [1, 0]], dtype=np.int)
+        w = np.array([[0, -1], [1, 0]], dtype=np.int32)
         v= (node[e1] - node[e0])@w
         val = np.sum(v*node[e0], axis=1)
         a = sum(val)/2
@@ -167,14 +191,22 @@ class HalfEdgeDomain():
 
         NE1 = 2*len(ec)
 
-        halfedge1 = np.zeros((NE1, 6), dtype=itype)
+        # 一次性分配加密后的半边表, 新的半边直接写入尾部,
+        # 免去 (NE1, 6) 的临时数组和一次 np.r_ 拼接拷贝
+        total = np.empty((NE+NE1, 6), dtype=itype)
+        total[:NE] = halfedge
+        halfedge = total[:NE]
+        halfedge1 = total[NE:]
+
         flag1 = isMainHEdge[isMarkedHEdge] # 标记加密边中的主半边
         halfedge1[flag1, 0] = range(NV, NV+NE1//2) # 新的节点编号
-        idx0 = np.argsort(idx) # 当前边的对偶边的从小到大进行排序
-        halfedge1[~flag1, 0] = halfedge1[flag1, 0][idx0] # 按照排序
+        # 按对偶边编号散射新节点编号, 代替 argsort 排序, O(NE) 而非 O(NE log NE)
+        tmp = np.empty(NE, dtype=itype)
+        tmp[idx] = halfedge1[flag1, 0]
+        halfedge1[~flag1, 0] = tmp[isMarkedHEdge & ~isMainHEdge]
 
         halfedge1[:, 1] = halfedge[isMarkedHEdge, 1]
-        halfedge1[:, 3] = halfedge[isMarkedHEdge, 3] # 前一个 
+        halfedge1[:, 3] = halfedge[isMarkedHEdge, 3] # 前一个
         halfedge1[:, 4] = halfedge[isMarkedHEdge, 4] # 对偶边
         halfedge1[:, 5] = halfedge[isMarkedHEdge, 5] # 主边标记
 
@@ -182,19 +214,22 @@ class HalfEdgeDomain():
         idx = halfedge[isMarkedHEdge, 4] # 原始对偶边
         halfedge[isMarkedHEdge, 4] = halfedge[idx, 3]  # 原始对偶边的前一条边是新的对偶边
 
-        halfedge = np.r_['0', halfedge, halfedge1]
-        halfedge[halfedge[:, 3], 2] = range(NE+NE1)
+        total[total[:, 3], 2] = range(NE+NE1)
 
-        if inplace: 
-            self.halfedge = halfedge
-            self.vertices = np.r_['0', vertices, ec] 
-            self.fixed = np.r_['0', 
+        if inplace:
+            self.halfedge = total
+            vertices1 = np.empty((NV+NE1//2, vertices.shape[1]),
+                    dtype=vertices.dtype)
+            vertices1[:NV] = vertices
+            vertices1[NV:] = ec
+            self.vertices = vertices1
+            self.fixed = np.r_['0',
                     self.fixed,
-                    np.zeros_like(ec[:, 0], dtype=np.bool_)] 
+                    np.zeros_like(ec[:, 0], dtype=np.bool_)]
             self.NV += NE1//2
-            self.NE += NE1 
+            self.NE += NE1
         else:
-            return ec, halfedge
+            return ec, total
 
     def boundary_uniform_refine(self, n=1, vertices=None, halfedge=None):
         inplace = True
@@ -206,50 +241,66 @@ class HalfEdgeDomain():
             itype = halfedge.dtype
             ftype = vertices.dtype
 
+        if inplace:
+            NE = self.NE
+            NV = self.NV
+            vertices = self.vertices
+            halfedge = self.halfedge
+        else:
+            NE = len(halfedge)
+            NV = len(vertices)
+
+        NV0 = NV
+
+        # 预先分配最终规模的数组, 避免每层加密都用 np.r_ 重新拼接拷贝
+        NEF = NE << n
+        NVF = NV + NE*(2**n - 1)//2
+        halfedge_out = np.empty((NEF, 6), dtype=itype)
+        vertices_out = np.empty((NVF, vertices.shape[1]), dtype=ftype)
+        halfedge_out[:NE] = halfedge
+        vertices_out[:NV] = vertices
+
         for i in range(n):
-            if inplace:
-                NE = self.NE
-                NV = self.NV
-                vertices = self.vertices
-                halfedge = self.halfedge
-            else:
-                NE = len(halfedge)
-                NV = len(vertices)
-            
+            he = halfedge_out[:NE]
+
             # 求中点
-            isMainHEdge = halfedge[:, 5] == 1
-            idx = halfedge[isMainHEdge, 4]
-            ec = (vertices[halfedge[isMainHEdge, 0]] + vertices[halfedge[idx, 0]])/2
+            isMainHEdge = he[:, 5] == 1
+            idx = he[isMainHEdge, 4]
+            vertices_out[NV:NV+NE//2] = (vertices_out[he[isMainHEdge, 0]]
+                    + vertices_out[he[idx, 0]])/2
 
             #细分边
-            halfedge1 = np.zeros((NE, 6), dtype=itype)
-            halfedge1[isMainHEdge, 0] = range(NV, NV + NE//2) # 新的节点编号
-            idx0 = np.argsort(idx) # 当前边的对偶边的从小到大进行排序
-            halfedge1[~isMainHEdge, 0] = halfedge1[isMainHEdge, 0][idx0] # 按照排序
-
-            halfedge1[:, 1] = halfedge[:, 1]
-            halfedge1[:, 3] = halfedge[:, 3] # 前一个 
-            halfedge1[:, 4] = halfedge[:, 4] # 对偶边
-            halfedge1[:, 5] = halfedge[:, 5] # 主边标记
-
-            halfedge[:, 3] = range(NE, 2*NE)
-            idx = halfedge[:, 4] # 原始对偶边
-            halfedge[:, 4] = halfedge[idx, 3]  # 原始对偶边的前一条边是新的对偶边
-
-            vertices = np.r_['0', vertices, ec]
-            halfedge = np.r_['0', halfedge, halfedge1]
-            halfedge[halfedge[:, 3], 2] = range(2*NE)
-
-            if inplace: 
-                self.halfedge = halfedge
-                self.vertices = vertices 
-                self.fixed = np.r_['0', 
-                        self.fixed, 
-                        np.zeros_like(ec[:, 0], dtype=np.bool_)]
-                self.NV += NE//2
-                self.NE *= 2
-            else:
-                return vertices, halfedge
+            he1 = halfedge_out[NE:2*NE]
+            he1[isMainHEdge, 0] = range(NV, NV + NE//2) # 新的节点编号
+            # 按对偶边编号散射新节点编号, 代替 argsort 排序
+            tmp = np.empty(NE, dtype=itype)
+            tmp[idx] = he1[isMainHEdge, 0]
+            he1[~isMainHEdge, 0] = tmp[~isMainHEdge]
+
+            he1[:, 1] = he[:, 1]
+            he1[:, 3] = he[:, 3] # 前一个
+            he1[:, 4] = he[:, 4] # 对偶边
+            he1[:, 5] = he[:, 5] # 主边标记
+
+            he[:, 3] = range(NE, 2*NE)
+            idx = he[:, 4] # 原始对偶边
+            he[:, 4] = halfedge_out[idx, 3]  # 原始对偶边的前一条边是新的对偶边
+
+            halfedge_out[halfedge_out[:2*NE, 3], 2] = range(2*NE)
+
+            NV += NE//2
+            NE *= 2
+
+        if inplace:
+            self.halfedge = halfedge_out
+            self.vertices = vertices_out
+            self.fixed = np.r_['0',
+                    self.fixed,
+                    np.zeros(NV - NV0, dtype=np.bool_)]
+            self.NV = NV
+            self.NE = NE
+        else:
+            return vertices_out, halfedge_out
 
     def number_of_vertices(self):
         return self.NV
@@ -260,6 +311,20 @@ class HalfEdgeDomain():
     def number_of_subdomains(self):
         return self.NS
 
+    def neighbor_matrix(self, rp, rv, NG):
+        """
+        建立 generator 的邻接关系矩阵
+
+        直接构造 CSR 的 (data, indices, indptr), 省去 COO 矩阵相加和
+        tocsr 转换带来的两次全量分配与排序.
+        """
+        rows = np.concatenate((rp[:, 0], rp[:, 1]))
+        cols = np.concatenate((rp[:, 1], rp[:, 0]))
+        data = np.concatenate((rv[:, 0] + 1, rv[:, 1] + 1))
+        idx = np.lexsort((cols, rows))
+        indptr = np.searchsorted(rows[idx], np.arange(NG+1))
+        return csr_matrix((data[idx], cols[idx], indptr), shape=(NG, NG))
+
     def create_finite_voronoi(self, points):
         """
         给定一组点, 生成相应 finite  Voronoi Regions 
@@ -298,9 +363,7 @@ class HalfEdgeDomain():
         _, pre = (m1*m0.T).nonzero()
 
         # 建立 generator 的邻接关系矩阵
-        neighbor  = coo_matrix((rv[:, 0] + 1, (rp[:, 0], rp[:, 1])), shape=(NG, NG))
-        neighbor += coo_matrix((rv[:, 1] + 1, (rp[:, 1], rp[:, 0])), shape=(NG, NG))
-        neighbor = neighbor.tocsr()
+        neighbor = self.neighbor_matrix(rp, rv, NG)
 
         # 建立半边数据结构
         ne = len(rv)
@@ -390,9 +453,7 @@ class HalfEdgeDomain():
         rv[isInfVertices, 0] = range(nv, nv+nn)
 
         # 建立 generator 的邻接关系矩阵
-        neighbor  = coo_matrix((rv[:, 0] + 1, (rp[0], rp[1])), shape=(NG, NG))
-        neighbor += coo_matrix((rv[:, 1] + 1, (rp[1], rp[0])), shape=(NG, NG))
-        neighbor = neighbor.tocsr()
+        neighbor = self.neighbor_matrix(rp, rv, NG)
 
         # 分配空间
         vertices = np.zeros((100, 2), dtype=ftype)
@@ -403,6 +464,7 @@ class HalfEdgeDomain():
         halfedge1 = self.halfedge.copy()
 
         # 自适应加密边界, 直到相邻边界点所属的 Voronoi Region 相同或者相邻
+        scratch = np.empty(0, dtype=np.bool_) # 标记数组的可复用缓冲区
         while True:
             NE = len(halfedge1)
             isMainHEdge = (halfedge1[:, 5] == 1)
@@ -423,8 +485,15 @@ class HalfEdgeDomain():
                 isNGenerator[~isIntersect] = False
 
             isNotSGenerator = (gindex[e0] != gindex[e1])
-            isMarkedHEdge = np.zeros(NE, dtype=np.bool_)
-            isMarkedHEdge[isMainHEdge][~isNGenerator & isNotSGenerator] =True
+            if len(scratch) < NE:
+                scratch = np.empty(2*NE, dtype=np.bool_)
+            isMarkedHEdge = scratch[:NE]
+            isMarkedHEdge[:] = False
+            # 注意: 链式布尔索引的赋值只会写入临时数组, 这里必须先取出
+            # 主半边的全局编号再散射标记, 同时把对偶半边一并标记
+            marked = np.flatnonzero(isMainHEdge)[~isNGenerator & isNotSGenerator]
+            isMarkedHEdge[marked] = True
+            isMarkedHEdge[halfedge1[marked, 4]] = True
             if np.any(isMarkedHEdge):
                 nn = isMarkedHEdge.sum()//2
                 vertices[end:end+nn], halfedge1 = self.halfedge_adaptive_refine(
@@ -450,8 +519,13 @@ class HalfEdgeDomain():
 
         isIntersect, ec = self.is_intersect(p0, p1, v0, v1, returnin=True)
         NE = len(halfedge1)
-        isMarkedHEdge = np.zeros(NE, dtype=np.bool_)
-        isMarkedHEdge[isMainHEdge][isNotSGenerator] =True
+        if len(scratch) < NE:
+            scratch = np.empty(NE, dtype=np.bool_)
+        isMarkedHEdge = scratch[:NE]
+        isMarkedHEdge[:] = False
+        marked = np.flatnonzero(isMainHEdge)[isNotSGenerator]
+        isMarkedHEdge[marked] = True
+        isMarkedHEdge[halfedge1[marked, 4]] = True
         nn = isMarkedHEdge.sum()//2
         vertices[end:end+nn], halfedge1 = self.halfedge_adaptive_refine(
             isMarkedHEdge, vertices=vertices, halfedge=halfedge1, 
@@ -467,27 +541,22 @@ class HalfEdgeDomain():
         return mesh
 
     def is_intersect(self, p0, p1, v0, v1, returnin=False):
-        ftype = p0.dtype
         s = p1 - p0
         r = v1 - v0
         v = v0 - p1
-        n = len(s)
 
         c0 = np.cross(r, s)
         c1 = np.cross(v, r)
         c2 = np.cross(v, s)
 
-        isColinear = (np.abs(c0) == 0.0) & (np.abs(c1) == 0.0)
-        isParallel = (np.abs(c0) == 0.0) & (np.abs(c1) != 0.0)
-
-        flag = (~isColinear) & (~isParallel)
-        t = np.zeros(n, dtype=ftype)
-        u = np.zeros(n, dtype=ftype)
-
-        t[flag] = c2[flag]/c0[flag]
-        u[flag] = c1[flag]/c0[flag] 
+        # 两条线段既不共线也不平行时才可能相交
+        d = np.where(np.abs(c0) > 0.0, c0, np.inf)
+        t = c2/d
+        u = c1/d
 
-        isIntersect = flag & t >= 0.0 & t <= 1.0 & u >= 0.0 & u <=1.0
+        isIntersect = (np.abs(c0) > 0.0) \
+                & (t >= 0.0) & (t <= 1.0) \
+                & (u >= 0.0) & (u <= 1.0)
         if returnin:
             return isIntersect, p0 + s*t.reshape(-1, 1)
         else:
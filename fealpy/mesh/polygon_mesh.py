@@ -1,14 +1,82 @@
 import numpy as np
-from typing import Union
+from functools import cached_property, lru_cache
+from typing import NamedTuple, Union
 from numpy.typing import NDArray
 from scipy.sparse import csr_matrix, coo_matrix
 import inspect
 
-from ..common import ranges
-
 from .mesh_base import Mesh, Plotable
 from .mesh_data_structure import MeshDataStructure, ArrRedirector
 
+try:
+    from numba import njit
+
+    @njit(cache=True, fastmath=True)
+    def _cell_area_kernel(node, edge, e2c0, e2c1, NC):
+        # 单元面积的散度定理求和: 单次遍历所有边, 直接累加到所在单元,
+        # 不产生 NumPy 版本的若干 NE 长度的临时数组
+        a = np.zeros(NC, dtype=node.dtype)
+        for i in range(edge.shape[0]):
+            x0 = node[edge[i, 0], 0]
+            y0 = node[edge[i, 0], 1]
+            dx = node[edge[i, 1], 0] - x0
+            dy = node[edge[i, 1], 1] - y0
+            val = dy*x0 - dx*y0
+            a[e2c0[i]] += val
+            if e2c0[i] != e2c1[i]:
+                a[e2c1[i]] -= val
+        return a/2.0
+except ImportError:
+    _cell_area_kernel = None
+
+
+@lru_cache(maxsize=64)
+def _einsum_path(sig: str, *shapes):
+    """
+    @brief 按 (下标约定, 操作数形状) 缓存 np.einsum 的收缩路径,
+           重复调用时省去每次的字符串解析和路径规划
+    """
+    ops = [np.empty(shape) for shape in shapes]
+    return np.einsum_path(sig, *ops, optimize='optimal')[0]
+
+
+@lru_cache(maxsize=32)
+def _lobatto_interior_bcs(p: int) -> NDArray:
+    """
+    @brief 缓存 p+1 点 Lobatto 积分公式的内部重心坐标, 只依赖于 p
+    """
+    from ..quadrature import GaussLobattoQuadrature
+    bcs = GaussLobattoQuadrature(p+1).quadpts[1:-1, :].copy()
+    bcs.setflags(write=False)
+    return bcs
+
+
+@lru_cache(maxsize=32)
+def _cell_lattice_bcs(p: int) -> NDArray:
+    """
+    @brief 缓存单元内部插值点对应的格点重心坐标, 只依赖于 p
+    """
+    bcs = Mesh.multi_index_matrix(p-2, 2)/(p-2)
+    bcs.setflags(write=False)
+    return bcs
+
+
+class RaggedArray(NamedTuple):
+    """
+    @brief CSR 风格的不等长二维数组
+
+    data 是按行拼接的扁平数据, indptr 给出每一行的起止位置,
+    第 i 行即 data[indptr[i]:indptr[i+1]].
+    """
+    data: NDArray
+    indptr: NDArray
+
+    def row(self, i: int) -> NDArray:
+        """
+        @brief 返回第 i 行的视图, 不产生拷贝
+        """
+        return self.data[self.indptr[i]:self.indptr[i+1]]
+
 
 class PolygonMesh(Mesh, Plotable):
     """
@@ -16,7 +84,8 @@ class PolygonMesh(Mesh, Plotable):
     """
     ds: "PolygonMeshDataStructure"
 
-    def __init__(self, node: NDArray, cell: NDArray, cellLocation=None, topdata=None):
+    def __init__(self, node: NDArray, cell: NDArray, cellLocation=None,
+            topdata=None, index_dtype='auto'):
         self.node = node
         if cellLocation is None:
             if len(cell.shape) == 2:
@@ -27,6 +96,16 @@ class PolygonMesh(Mesh, Plotable):
             else:
                 raise ValueError("Miss `cellLocation` array!")
 
+        # 顶点数不超过 int32 范围时把索引流压缩到 32 位,
+        # construct/cell_area/integral 等访存受限的扫描带宽减半
+        if index_dtype == 'auto':
+            if node.shape[0] < np.iinfo(np.int32).max:
+                index_dtype = np.int32
+            else:
+                index_dtype = cell.dtype
+        cell = cell.astype(index_dtype, copy=False)
+        cellLocation = np.asarray(cellLocation).astype(index_dtype, copy=False)
+
         self.ds = PolygonMeshDataStructure(node.shape[0], cell, cellLocation,
                 topdata=None)
         self.meshtype = 'polygon'
@@ -60,9 +139,14 @@ class PolygonMesh(Mesh, Plotable):
         GD = self.geo_dimension()
 
         if etype in {'cell', 2}:
-            cell2node = self.ds.cell_to_node(return_sparse=True)
-            NV = self.ds.number_of_vertices_of_cells().reshape(-1, 1)
-            bc = cell2node*node/NV
+            # 直接按单元分段求和顶点坐标, 不组装 (NC, NN) 稀疏矩阵
+            NC = self.number_of_cells()
+            NV = self.ds.number_of_vertices_of_cells()
+            cellIdx = self.ds.cellIdx
+            coords = node[self.ds._cell]
+            bc = np.stack(
+                    [np.bincount(cellIdx, weights=coords[:, d], minlength=NC)
+                        for d in range(GD)], axis=1)/NV[:, None]
         elif etype in {'edge', 'face', 1}:
             edge = self.ds.edge
             bc = np.mean(node[edge, :], axis=1).reshape(-1, GD)
@@ -88,18 +172,20 @@ class PolygonMesh(Mesh, Plotable):
         NC = self.number_of_cells()
         node = self.entity('node')
         edge = self.entity('edge')
-        edge2cell = self.ds.edge_to_cell()
+        e2c0 = self.ds.e2c_left
+        e2c1 = self.ds.e2c_right
+
+        if _cell_area_kernel is not None:
+            return _cell_area_kernel(node, edge, e2c0, e2c1, NC)[index]
 
         t = self.edge_tangent()
         val = t[:, 1]*node[edge[:, 0], 0] - t[:, 0]*node[edge[:, 0], 1]
 
-        a = np.zeros(NC, dtype=self.ftype)
-        np.add.at(a, edge2cell[:, 0], val)
-
-        isInEdge = (edge2cell[:, 0] != edge2cell[:, 1])
-        np.add.at(a, edge2cell[isInEdge, 1], -val[isInEdge])
-
-        a /= 2.0
+        # 把左右两侧的 (单元号, 贡献) 拼在一起, 一趟 bincount 分段求和
+        inIdx = self.ds.interior_edge_idx
+        ids = np.concatenate([e2c0, e2c1[inIdx]])
+        vals = np.concatenate([val, -val[inIdx]])
+        a = np.bincount(ids, weights=vals, minlength=NC)/2.0
 
         return a[index]
 
@@ -117,7 +203,9 @@ class PolygonMesh(Mesh, Plotable):
         """
         node = self.entity('node')
         edge = self.entity('edge')
-        ps = np.einsum('ij, kjm->ikm', bcs, node[edge[index]])
+        points = node[edge[index]]
+        path = _einsum_path('ij, kjm->ikm', bcs.shape, points.shape)
+        ps = np.einsum('ij, kjm->ikm', bcs, points, optimize=path)
         return ps
 
     face_bc_to_point = edge_bc_to_point
@@ -149,6 +237,36 @@ class PolygonMesh(Mesh, Plotable):
         elif iptype in {'node', 0}:
             return 1
 
+    def _build_cell_to_ipoint(self, p: int):
+        """
+        @brief 组装扁平的单元-插值点表及其 CSR 偏移
+        """
+        NC = self.number_of_cells()
+        ldof = self.number_of_local_ipoints(p, iptype='all')
+
+        location = np.zeros(NC+1, dtype=self.itype)
+        location[1:] = np.add.accumulate(ldof)
+
+        cell2ipoint = np.zeros(location[-1], dtype=self.itype)
+
+        edge2ipoint = self.edge_to_ipoint(p)
+        ds = self.ds
+
+        idx = (location[ds.e2c_left] + ds.e2c_left_local*p).reshape(-1, 1) + np.arange(p)
+        cell2ipoint[idx] = edge2ipoint[:, 0:p]
+
+        isInEdge = ds.isInEdge
+        idx = (location[ds.e2c_right[isInEdge]] + ds.e2c_right_local[isInEdge]*p).reshape(-1, 1) + np.arange(p)
+        cell2ipoint[idx] = edge2ipoint[isInEdge, p:0:-1]
+
+        NN = self.number_of_nodes()
+        NV = self.ds.number_of_vertices_of_cells()
+        NE = self.number_of_edges()
+        cdof = self.number_of_local_ipoints(p, iptype='cell')
+        idx = (location[:-1] + NV*p).reshape(-1, 1) + np.arange(cdof)
+        cell2ipoint[idx] = NN + NE*(p-1) + np.arange(NC*cdof).reshape(NC, cdof)
+        return cell2ipoint, location
+
     def cell_to_ipoint(self, p: int, index=np.s_[:]) -> NDArray:
         """
         @brief
@@ -157,48 +275,35 @@ class PolygonMesh(Mesh, Plotable):
         if p == 1:
             return cell[index]
         else:
-            NC = self.number_of_cells()
-            ldof = self.number_of_local_ipoints(p, iptype='all')
-
-            location = np.zeros(NC+1, dtype=self.itype)
-            location[1:] = np.add.accumulate(ldof)
-
-            cell2ipoint = np.zeros(location[-1], dtype=self.itype)
-
-            edge2ipoint = self.edge_to_ipoint(p)
-            edge2cell = self.ds.edge_to_cell()
-
-            idx = location[edge2cell[:, [0]]] + edge2cell[:, [2]]*p + np.arange(p)
-            cell2ipoint[idx] = edge2ipoint[:, 0:p]
+            cell2ipoint, location = self._build_cell_to_ipoint(p)
+            return np.hsplit(cell2ipoint, location[1:-1])[index]
 
-            isInEdge = (edge2cell[:, 0] != edge2cell[:, 1])
-            idx = (location[edge2cell[isInEdge, 1]] + edge2cell[isInEdge, 3]*p).reshape(-1, 1) + np.arange(p)
-            cell2ipoint[idx] = edge2ipoint[isInEdge, p:0:-1]
+    def cell_to_ipoint_ragged(self, p: int) -> "RaggedArray":
+        """
+        @brief 以 CSR 风格的 (data, indptr) 对返回单元-插值点表,
+               避免 np.hsplit 生成 NC 个 Python 级的子数组
 
-            NN = self.number_of_nodes()
-            NV = self.ds.number_of_vertices_of_cells()
-            NE = self.number_of_edges()
-            cdof = self.number_of_local_ipoints(p, iptype='cell')
-            idx = (location[:-1] + NV*p).reshape(-1, 1) + np.arange(cdof)
-            cell2ipoint[idx] = NN + NE*(p-1) + np.arange(NC*cdof).reshape(NC, cdof)
-            return np.hsplit(cell2ipoint, location[1:-1])[index]
+        p == 1 时退化为规则的 (NC, NV) 情况, 仍返回 RaggedArray.
+        """
+        if p == 1:
+            ds = self.ds
+            return RaggedArray(ds._cell, ds.cellLocation)
+        cell2ipoint, location = self._build_cell_to_ipoint(p)
+        return RaggedArray(cell2ipoint, location)
 
     def edge_to_ipoint(self, p: int, index=np.s_[:]) -> NDArray:
         """
         @brief 获取网格边与插值点的对应关系
 
         """
-        if isinstance(index, slice) and index == slice(None):
-            NE = self.number_of_edges()
-            index = np.arange(NE)
-        elif isinstance(index, np.ndarray) and (index.dtype == np.bool_):
-            index, = np.nonzero(index)
-            NE = len(index)
-        elif isinstance(index, list) and (type(index[0]) is np.bool_):
-            index, = np.nonzero(index)
-            NE = len(index)
+        # 统一归一化为一维整数下标数组, 省掉对 Python list 的逐项嗅探
+        if isinstance(index, slice):
+            index = np.arange(self.number_of_edges(), dtype=self.itype)[index]
         else:
-            NE = len(index)
+            index = np.asarray(index)
+            if index.dtype == np.bool_:
+                index = np.flatnonzero(index)
+        NE = len(index)
 
         NN = self.number_of_nodes()
 
@@ -260,9 +365,18 @@ class PolygonMesh(Mesh, Plotable):
         start += NN
 
         edge = self.entity('edge')
-        qf = self.integrator(p+1, etype='edge', qtype='lobatto')
-        bcs = qf.quadpts[1:-1, :]
-        ipoint[start:NN+(p-1)*NE, :] = np.einsum('ij, ...jm->...im', bcs, node[edge, :]).reshape(-1, GD)
+        bcs = _lobatto_interior_bcs(p)
+        if bcs.shape[1] == 2:
+            # 两端点的凸组合直接展开成两次广播乘加, 免去 einsum 的
+            # 每次调用的收缩规划
+            w0 = bcs[:, 0]
+            w1 = bcs[:, 1]
+            pts = w0[None, :, None]*node[edge[:, 0]][:, None, :] \
+                    + w1[None, :, None]*node[edge[:, 1]][:, None, :]
+            ipoint[start:NN+(p-1)*NE, :] = pts.reshape(-1, GD)
+        else:
+            ipoint[start:NN+(p-1)*NE, :] = np.einsum(
+                    'ij, ...jm->...im', bcs, node[edge, :]).reshape(-1, GD)
         start += (p-1)*NE
 
         if p == 2:
@@ -282,7 +396,7 @@ class PolygonMesh(Mesh, Plotable):
         tri[:, 1, :] = bc + t[1]*h
         tri[:, 2, :] = bc + t[2]*h
 
-        bcs = self.multi_index_matrix(p-2, 2)/(p-2)
+        bcs = _cell_lattice_bcs(p)
         ipoint[start:] = np.einsum('ij, ...jm->...im', bcs, tri).reshape(-1, GD)
         return ipoint
 
@@ -304,42 +418,45 @@ class PolygonMesh(Mesh, Plotable):
         """
         node = self.entity('node')
         edge = self.entity('edge')
-        edge2cell = self.ds.edge_to_cell()
         NC = self.number_of_cells()
 
         bcs, ws = self.integrator(q).get_quadrature_points_and_weights()
 
         bc = self.entity_barycenter('cell')
-        tri = [bc[edge2cell[:, 0]], node[edge[:, 0]], node[edge[:, 1]]]
-
-        v1 = node[edge[:, 0]] - bc[edge2cell[:, 0]]
-        v2 = node[edge[:, 1]] - bc[edge2cell[:, 0]]
-        a = np.cross(v1, v2)/2.0
-
-        pp = np.einsum('ij, jkm->ikm', bcs, tri, optimize=True)
-        val = u(pp, edge2cell[:, 0])
-
-        shape = (NC, ) + val.shape[2:]
-        e = np.zeros(shape, dtype=np.float64)
 
-        ee = np.einsum('i, ij..., j->j...', ws, val, a, optimize=True)
-        np.add.at(e, edge2cell[:, 0], ee)
-
-        isInEdge = (edge2cell[:, 0] != edge2cell[:, 1])
-        if np.sum(isInEdge) > 0:
-            tri = [
-                    bc[edge2cell[isInEdge, 1]],
-                    node[edge[isInEdge, 1]],
-                    node[edge[isInEdge, 0]]
-                    ]
-            v1 = node[edge[isInEdge, 1]] - bc[edge2cell[isInEdge, 1]]
-            v2 = node[edge[isInEdge, 0]] - bc[edge2cell[isInEdge, 1]]
-            a = np.cross(v1, v2)/2.0
-
-            pp = np.einsum('ij, jkm->ikm', bcs, tri, optimize=True)
-            val = u(pp, edge2cell[isInEdge, 1])
-            ee = np.einsum('i, ij..., j->j...', ws, val, a, optimize=True)
-            np.add.at(e, edge2cell[isInEdge, 1], ee)
+        # 每条边与其左、右单元的重心各构成一个三角形, 把两侧的贡献拼在
+        # 一起, 被积函数只求值一次, 散射也只做一次
+        inIdx = self.ds.interior_edge_idx
+        cellIdx = np.concatenate([self.ds.e2c_left, self.ds.e2c_right[inIdx]])
+        p0 = np.concatenate([node[edge[:, 0]], node[edge[inIdx, 1]]])
+        p1 = np.concatenate([node[edge[:, 1]], node[edge[inIdx, 0]]])
+        bcc = bc[cellIdx]
+
+        tri = np.stack([bcc, p0, p1], axis=0)
+        a = np.cross(p0 - bcc, p1 - bcc)/2.0
+
+        pp = np.einsum('ij, jkm->ikm', bcs, tri,
+                optimize=_einsum_path('ij, jkm->ikm', bcs.shape, tri.shape))
+        val = u(pp, cellIdx)
+
+        # 手工拆开 'i, ij..., j->j...' 收缩: 先对三角形面积做一次广播
+        # 乘法, 再用 tensordot 走 BLAS 的矩阵乘, 避免 einsum 在多个广播
+        # 轴下生成的大中间缓冲区
+        assert val.shape[0] == len(ws) and val.shape[1] == len(a)
+        weighted = val * a.reshape((1, -1) + (1, )*(val.ndim - 2))
+        ee = np.tensordot(ws, weighted, axes=([0], [0]))
+
+        # np.bincount 的分段求和是紧凑的 C 循环, 远快于 np.add.at
+        # 的无缓冲散射路径
+        if ee.ndim == 1:
+            e = np.bincount(cellIdx, weights=ee, minlength=NC)
+        else:
+            K = ee[0].size
+            flat = ee.reshape(-1, K)
+            e = np.empty((NC, K), dtype=np.float64)
+            for k in range(K):
+                e[:, k] = np.bincount(cellIdx, weights=flat[:, k], minlength=NC)
+            e = e.reshape((NC, ) + ee.shape[1:])
 
         if celltype is True:
             return e
@@ -818,14 +935,14 @@ class PolygonMesh(Mesh, Plotable):
         NC = self.number_of_cells()
         node = self.node
         edge = self.ds.edge
-        edge2cell = self.ds.edge2cell
-        isInEdge = (edge2cell[:, 0] != edge2cell[:, 1])
-        w = np.array([[0, -1], [1, 0]], dtype=self.itype)
-        v= (node[edge[:, 1], :] - node[edge[:, 0], :])@w
-        val = np.sum(v*node[edge[:, 0], :], axis=1)
-        a = np.bincount(edge2cell[:, 0], weights=val, minlength=NC)
-        a+= np.bincount(edge2cell[isInEdge, 1], weights=-val[isInEdge], minlength=NC)
-        a /=2
+        inIdx = self.ds.interior_edge_idx
+        # 90 度旋转逐分量展开, 省掉 2x2 矩阵乘及其临时数组
+        dx = node[edge[:, 1], 0] - node[edge[:, 0], 0]
+        dy = node[edge[:, 1], 1] - node[edge[:, 0], 1]
+        val = dy*node[edge[:, 0], 0] - dx*node[edge[:, 0], 1]
+        ids = np.concatenate([self.ds.e2c_left, self.ds.e2c_right[inIdx]])
+        vals = np.concatenate([val, -val[inIdx]])
+        a = np.bincount(ids, weights=vals, minlength=NC)/2.0
         return a
 
 
@@ -888,17 +1005,45 @@ PolygonMesh.set_ploter('polygon2d')
 class PolygonMeshDataStructure(MeshDataStructure):
     # Variables
     face = ArrRedirector('edge')
-    edge2cell: NDArray
 
     # Constants
     TD: int = 2
 
+    @property
+    def edge2cell(self) -> NDArray:
+        """
+        @brief 以 (NE, 4) 数组的形式返回边与单元的邻接关系
+
+        @note: 四列按需由连续存储的一维数组拼装, 热点代码请直接使用
+               e2c_left, e2c_right, e2c_left_local, e2c_right_local.
+        """
+        return np.column_stack([self.e2c_left, self.e2c_right,
+                self.e2c_left_local, self.e2c_right_local])
+
+    @edge2cell.setter
+    def edge2cell(self, edge2cell: NDArray):
+        self.e2c_left = np.ascontiguousarray(edge2cell[:, 0])
+        self.e2c_right = np.ascontiguousarray(edge2cell[:, 1])
+        self.e2c_left_local = np.ascontiguousarray(edge2cell[:, 2])
+        self.e2c_right_local = np.ascontiguousarray(edge2cell[:, 3])
+        # 邻接关系换了, 依赖它的惰性缓存同步失效
+        for key in ('isInEdge', 'interior_edge_idx'):
+            self.__dict__.pop(key, None)
+
     def __init__(self, NN: int, cell: NDArray, cellLocation: NDArray, topdata=None):
         self.NN = NN
         self._cell = cell
         self.cellLocation = cellLocation
         self.itype = cell.dtype
 
+        # 每个单元首、末顶点在 _cell 中的位置, total_edge 会反复用到
+        self._firstIdx = cellLocation[:-1]
+        self._lastIdx = cellLocation[1:] - 1
+
+        # cellLocation 是等差数列(所有单元顶点数相同)时记下公差,
+        # NV 与单元定位可以退化成常数时间的算术运算
+        self.equalNV = self._detect_equal_NV()
+
         if topdata is None:
             self.construct()
         else:
@@ -910,22 +1055,85 @@ class PolygonMeshDataStructure(MeshDataStructure):
         self._cell = cell
         self.itype = cell.dtype
         self.cellLocation = cellLocation
+        self._firstIdx = cellLocation[:-1]
+        self._lastIdx = cellLocation[1:] - 1
+        self.equalNV = self._detect_equal_NV()
+        # 网格变动后重置惰性缓存的拓扑量
+        for key in ('NV', 'cellIdx', 'isInEdge', 'interior_edge_idx'):
+            self.__dict__.pop(key, None)
         self.construct()
 
     def number_of_cells(self) -> int:
         return self.cellLocation.shape[0] - 1
 
-    def number_of_vertices_of_cells(self):
+    def _detect_equal_NV(self):
+        """
+        @brief 所有单元顶点数相同时返回该顶点数, 否则返回 None
+        """
+        diff = np.diff(self.cellLocation)
+        if diff.shape[0] > 0 and np.all(diff == diff[0]):
+            return int(diff[0])
+        return None
+
+    @cached_property
+    def NV(self):
+        """
+        @brief 每个单元的顶点个数
+        """
+        if self.equalNV is not None:
+            return np.full(self.number_of_cells(), self.equalNV,
+                    dtype=self.itype)
         return self.cellLocation[1:] - self.cellLocation[0:-1]
 
+    @cached_property
+    def cellIdx(self):
+        """
+        @brief _cell 中每个顶点所属单元的编号
+        """
+        return self.cell_of_index(
+                np.arange(self._cell.shape[0], dtype=self.itype))
+
+    def cell_of_index(self, flat_idx):
+        """
+        @brief 查询 _cell 中扁平位置 flat_idx 所属的单元编号
+
+        cellLocation 单调递增, 二分查找即可反解, 零星查询时不必
+        物化整个 cellIdx 数组; 等差的情形直接整除.
+        """
+        if self.equalNV is not None:
+            return (flat_idx//self.equalNV).astype(self.itype, copy=False)
+        return np.searchsorted(self.cellLocation[1:], flat_idx,
+                side='right').astype(self.itype, copy=False)
+
+    @cached_property
+    def isInEdge(self):
+        """
+        @brief 内部边标记
+        """
+        return self.e2c_left != self.e2c_right
+
+    @cached_property
+    def interior_edge_idx(self):
+        """
+        @brief 内部边的编号, isInEdge 的 flatnonzero 结果
+
+        反复积分/估计误差时作为整数下标复用, 免去每次布尔取子集
+        隐含的 nonzero 归约.
+        """
+        return np.flatnonzero(self.isInEdge).astype(self.itype, copy=False)
+
+    def number_of_vertices_of_cells(self):
+        return self.NV
+
     number_of_edges_of_cells = number_of_vertices_of_cells
     number_of_faces_of_cells = number_of_vertices_of_cells
 
     def total_edge(self) -> NDArray:
-        totalEdge = np.zeros((self._cell.shape[0], 2), dtype=self.itype)
-        totalEdge[:, 0] = self._cell
-        totalEdge[:-1, 1] = self._cell[1:]
-        totalEdge[self.cellLocation[1:] - 1, 1] = self._cell[self.cellLocation[:-1]]
+        _cell = self._cell
+        totalEdge = np.empty((_cell.shape[0], 2), dtype=self.itype)
+        totalEdge[:, 0] = _cell
+        totalEdge[:-1, 1] = _cell[1:]
+        totalEdge[self._lastIdx, 1] = _cell[self._firstIdx]
         return totalEdge
 
     total_face = total_edge
@@ -935,28 +1143,37 @@ class PolygonMeshDataStructure(MeshDataStructure):
         @brief 构建多边形网格实体之间的邻接关系矩阵
         """
         totalEdge = self.total_edge()
-        _, i0, j = np.unique(np.sort(totalEdge, axis=1),
-                return_index=True,
-                return_inverse=True,
-                axis=0)
+        if self.NN < 2**31:
+            # 把每条无向边打包为一个 uint64 键, 一维 unique 只做一趟
+            # 8 字节键的排序, 比两列的 lexsort + 按行去重省一半以上访存
+            a = np.minimum(totalEdge[:, 0], totalEdge[:, 1]).astype(np.uint64)
+            b = np.maximum(totalEdge[:, 0], totalEdge[:, 1]).astype(np.uint64)
+            _, i0, j = np.unique((a << np.uint64(32)) | b,
+                    return_index=True,
+                    return_inverse=True)
+        else:
+            _, i0, j = np.unique(np.sort(totalEdge, axis=1),
+                    return_index=True,
+                    return_inverse=True,
+                    axis=0)
         NE = i0.shape[0]
-        self.edge2cell = np.zeros((NE, 4), dtype=self.itype)
 
         i1 = np.zeros(NE, dtype=self.itype)
         i1[j] = np.arange(len(self._cell))
 
         self.edge = totalEdge[i0]
 
-        NV = self.number_of_vertices_of_cells()
-        NC = self.number_of_cells()
-        cellIdx = np.repeat(range(NC), NV)
+        cellIdx = self.cellIdx
 
-        localIdx = ranges(NV)
+        # 全局位置减去所在单元的起始位置即得单元内局部编号
+        localIdx = np.arange(self._cell.shape[0], dtype=self.itype) \
+                - self.cellLocation[cellIdx]
 
-        self.edge2cell[:, 0] = cellIdx[i0]
-        self.edge2cell[:, 1] = cellIdx[i1]
-        self.edge2cell[:, 2] = localIdx[i0]
-        self.edge2cell[:, 3] = localIdx[i1]
+        # 边与单元的邻接关系按列拆开存储 (SoA), 方便连续扫描
+        self.e2c_left = cellIdx[i0]
+        self.e2c_right = cellIdx[i1]
+        self.e2c_left_local = localIdx[i0]
+        self.e2c_right_local = localIdx[i1]
         self.cell2edge = j
 
     @property
@@ -975,8 +1192,7 @@ class PolygonMeshDataStructure(MeshDataStructure):
             NN = self.number_of_nodes()
             NC = self.number_of_cells()
 
-            NV = self.number_of_vertices_of_cells()
-            I = np.repeat(range(NC), NV)
+            I = self.cellIdx
             J = self._cell
 
             val = np.ones(len(self._cell), dtype=np.bool_)
@@ -998,8 +1214,8 @@ class PolygonMeshDataStructure(MeshDataStructure):
             NC = self.number_of_cells()
             J = np.arange(NE)
             val = np.ones((NE,), dtype=np.bool_)
-            cell2edge  = coo_matrix((val, (self.edge2cell[:, 0], J)), shape=(NC, NE), dtype=np.bool_)
-            cell2edge += coo_matrix((val, (self.edge2cell[:, 1], J)), shape=(NC, NE), dtype=np.bool_)
+            cell2edge  = coo_matrix((val, (self.e2c_left, J)), shape=(NC, NE), dtype=np.bool_)
+            cell2edge += coo_matrix((val, (self.e2c_right, J)), shape=(NC, NE), dtype=np.bool_)
             return cell2edge.tocsr()
         else:
             return np.hsplit(self.cell2edge, self.cellLocation[1:-1])
@@ -1014,8 +1230,8 @@ class PolygonMeshDataStructure(MeshDataStructure):
             NE = self.number_of_edges()
             NC = self.number_of_cells()
             val = np.ones(NE, dtype=np.bool_)
-            edge2cell  = coo_matrix((val, (range(NE), self.edge2cell[:, 0])), shape=(NE, NC), dtype=np.bool_)
-            edge2cell += coo_matrix((val, (range(NE), self.edge2cell[:, 1])), shape=(NE, NC), dtype=np.bool_)
+            edge2cell  = coo_matrix((val, (range(NE), self.e2c_left)), shape=(NE, NC), dtype=np.bool_)
+            edge2cell += coo_matrix((val, (range(NE), self.e2c_right)), shape=(NE, NC), dtype=np.bool_)
             return edge2cell.tocsr()
         else:
             return self.edge2cell
@@ -2,7 +2,7 @@
 Modules for the Random Feature Method
 """
 
-from typing import List, Tuple, Union
+from typing import List, Sequence, Tuple, Union
 
 import torch
 from torch import Tensor, float64
@@ -311,3 +311,33 @@ class RandomFeaturePoUSpace(TensorSpace):
         return ret
 
     D = basis_derivative
+
+    def basis_batch(self, p: Tensor, derivs: Sequence[Tuple[int, ...]]):
+        """
+        @brief Evaluate several partial derivatives of all basis functions\
+               in a single pass, sharing the standardization and partition\
+               flags between them.
+
+        @param derivs: sequence of index tuples, as accepted by\
+               `basis_derivative`. An empty tuple stands for the basis\
+               values themselves.
+
+        @return: a list of tensors with shape (N, M), one per entry in `derivs`.
+        """
+        N = p.shape[0]
+        M = self.number_of_basis()
+        Jn = self.nlrf
+        rets = [torch.zeros((N, M), dtype=self.dtype, device=self.device)
+                for _ in derivs]
+        std = self.std(p)
+        for i, part in enumerate(self.partions):
+            x = std[:, i, :]
+            flag = part.flag(x) # Only take samples inside the supporting area
+            xf = x[flag, ...]
+            for k, idx in enumerate(derivs):
+                order = len(idx)
+                rets[k][flag, i*Jn:(i+1)*Jn]\
+                    = part.basis_derivative(xf, *idx)/self.std.radius[i]**order
+        return rets
+
+    UD_batch = basis_batch
@@ -17,6 +17,9 @@ class TrussBase:
 
 
 class Truss_3d():
+    _zero_cache: dict = {}
+    _FORCE = np.array([0.0, 900.0, 0.0])
+
     def __init__(self):
         """
         初始化函数
@@ -57,17 +60,17 @@ class Truss_3d():
 
     @cartesian
     def source(self, p):
-        shape = len(p.shape[:-1])*(1,) + (-1, )
-        val = np.zeros(shape, dtype=np.float_)
-        return val 
+        # 零载荷按形状缓存为只读的广播视图, 不再每次调用都分配
+        shape = len(p.shape[:-1])*(1,) + (1, )
+        return self._zero_cache.setdefault(shape,
+                np.broadcast_to(np.zeros(1, dtype=np.float64), shape))
 
     @cartesian
     def force(self):
         '''
         施加 (0, 900, 0) 的力，即平行于 y 轴方向大小为 900N 的力
         '''
-        val = np.array([0, 900, 0])
-        return val
+        return self._FORCE
 
     def is_force_boundary(self, p):
         '''
@@ -98,6 +101,9 @@ class Truss_3d_simple_truss():
 
 
 class Truss_2d_four_bar():
+    _zero_cache: dict = {}
+    _FORCE = np.array([0.0, 900.0, 0.0])
+
     def __init__(self):
         self.A = 100 # 横截面积 mm^2
         self.E = 29.5e4 # 弹性模量 ton/mm^2
@@ -124,23 +130,24 @@ class Truss_2d_four_bar():
 
     @cartesian
     def source(self, p):
-        shape = len(p.shape[:-1])*(1,) + (-1, )
-        val = np.zeros(shape, dtype=np.float_)
-        return val 
+        # 零载荷按形状缓存为只读的广播视图, 不再每次调用都分配
+        shape = len(p.shape[:-1])*(1,) + (1, )
+        return self._zero_cache.setdefault(shape,
+                np.broadcast_to(np.zeros(1, dtype=np.float64), shape))
 
     @cartesian
     def force(self, p):
         '''
         施加 (0, 900, 0) 的力，即平行于 y 轴方向大小为 900N 的力
         '''
-        val = np.array([0, 900, 0])
-        return val
+        return self._FORCE
 
     def is_force_boundary(self, p):
         '''
         对第 3, 4 号节点施加力
         '''
-        return np.abs(p[..., 1]) < 1e-12 and np.ads(p[..., 0]) > 1e-12
+        return np.logical_and(np.abs(p[..., 1]) < 1e-12,
+                np.abs(p[..., 0]) > 1e-12)
 
     @cartesian
     def dirichlet(self, p):
@@ -154,6 +161,9 @@ class Truss_2d_four_bar():
 
 
 class Truss_2d_balcony_truss(TrussBase):
+    _zero_cache: dict = {}
+    _FORCE = np.array([0.0, 900.0, 0.0])
+
     def __init__(self):
         self.A = 8 # 横截面积 in^2
         self.E = 1.9e6 # 弹性模量 lb/in^2
@@ -181,23 +191,24 @@ class Truss_2d_balcony_truss(TrussBase):
 
     @cartesian
     def source(self, p):
-        shape = len(p.shape[:-1])*(1,) + (-1, )
-        val = np.zeros(shape, dtype=np.float_)
-        return val 
+        # 零载荷按形状缓存为只读的广播视图, 不再每次调用都分配
+        shape = len(p.shape[:-1])*(1,) + (1, )
+        return self._zero_cache.setdefault(shape,
+                np.broadcast_to(np.zeros(1, dtype=np.float64), shape))
 
     @cartesian
     def force(self, p):
         '''
         施加 (0, 900, 0) 的力，即平行于 y 轴方向大小为 900N 的力
         '''
-        val = np.array([0, 900, 0])
-        return val
+        return self._FORCE
 
     def is_force_boundary(self, p):
         '''
         对第 3, 4 号节点施加力
         '''
-        return np.abs(p[..., 1]) < 1e-12 and np.ads(p[..., 0]) > 1e-12
+        return np.logical_and(np.abs(p[..., 1]) < 1e-12,
+                np.abs(p[..., 0]) > 1e-12)
 
     @cartesian
     def dirichlet(self, p):
@@ -210,6 +221,9 @@ class Truss_2d_balcony_truss(TrussBase):
         return np.abs(p[..., 0]) < 1e-12
 
 class Truss_2d_old():
+    _zero_cache: dict = {}
+    _FORCE = np.array([0.0, 900.0, 0.0])
+
     def __init__(self):
         self.A = 6451.6 # 横截面积 mm^2
         self.E = 0.7031 # 弹性模量 ton/mm^2
@@ -243,23 +257,24 @@ class Truss_2d_old():
 
     @cartesian
     def source(self, p):
-        shape = len(p.shape[:-1])*(1,) + (-1, )
-        val = np.zeros(shape, dtype=np.float_)
-        return val 
+        # 零载荷按形状缓存为只读的广播视图, 不再每次调用都分配
+        shape = len(p.shape[:-1])*(1,) + (1, )
+        return self._zero_cache.setdefault(shape,
+                np.broadcast_to(np.zeros(1, dtype=np.float64), shape))
 
     @cartesian
     def force(self, p):
         '''
         施加 (0, 900, 0) 的力，即平行于 y 轴方向大小为 900N 的力
         '''
-        val = np.array([0, 900, 0])
-        return val
+        return self._FORCE
 
     def is_force_boundary(self, p):
         '''
         对第 3, 4 号节点施加力
         '''
-        return np.abs(p[..., 1]) < 1e-12 and np.ads(p[..., 0]) > 1e-12
+        return np.logical_and(np.abs(p[..., 1]) < 1e-12,
+                np.abs(p[..., 0]) > 1e-12)
 
     @cartesian
     def dirichlet(self, p):
@@ -48,6 +48,22 @@ def test_polygon_mesh_interpolation_points_4():
     mesh.find_node(axes, node=ips, showindex=True)
     plt.show()
 
+def test_int32_itype():
+    node = np.array([
+        (0.0, 0.0), (0.0, 1.0), (0.0, 2.0), (1.0, 0.0), (1.0, 1.0), (1.0, 2.0),
+        (2.0, 0.0), (2.0, 1.0), (2.0, 2.0)], dtype=np.float64)
+    cell = np.array([0, 3, 4, 4, 1, 0, 1, 4, 5, 2, 3, 6, 7, 4, 4, 7, 8, 5],
+            dtype=np.int64)
+    cellLocation = np.array([0, 3, 6, 10, 14, 18], dtype=np.int64)
+    mesh = PolygonMesh(node, cell, cellLocation)
+
+    assert mesh.ds._cell.dtype == np.int32
+    assert mesh.ds.edge.dtype == np.int32
+
+    mesh64 = PolygonMesh(node, cell, cellLocation, index_dtype=np.int64)
+    np.testing.assert_equal(mesh.ds.edge, mesh64.ds.edge)
+    np.testing.assert_equal(mesh.ds.edge2cell, mesh64.ds.edge2cell)
+
 @pytest.mark.parametrize('meshtype', ['equ', 'iso'])
 def test_from_one_triangle(meshtype): 
     mesh = PolygonMesh.from_one_triangle(meshtype=meshtype)